@@ -1,14 +1,15 @@
 """Agent implementation for finding and evaluating child-friendly activities."""
 
-from agents import Agent, WebSearchTool
+from agents import Agent
 from models import TripContext, SearchResult  # Import SearchResult from ..models
+from tools.search_tools import SearchBackend, get_search_tools
 
 PROMPT = """You are a specialized search agent focused on finding activities suitable for children.
         
         Given the trip details (location, dates, participant ages including children) and weather information:
-        1. Focus your web search on activities explicitly marked as kid-friendly, family-oriented, or suitable for the specific ages of the children involved.
+        1. Focus your search on activities explicitly marked as kid-friendly, family-oriented, or suitable for the specific ages of the children involved.
         2. Look for parks, playgrounds, interactive museums, age-appropriate workshops, family-friendly restaurants, etc.
-        3. Execute searches using the web search tool.
+        3. Execute searches using the `search_local_activities` tool when it is available. Use web search only if the local tool is not available or has no results for the destination.
         4. For each promising activity found, extract and structure key information:
            - Name and description (highlighting child-friendly aspects)
            - Location
@@ -16,19 +17,21 @@ PROMPT = """You are a specialized search agent focused on finding activities sui
            - Price range (mentioning child/family discounts if found)
            - Duration
            - Weather dependency
-           - Source URL
+           - Source URL (if available; results from the local index have none)
         5. Compile a list of structured ActivityResult objects (defined within the SearchResult model).
         6. Provide a concise summary focusing on the suitability for the children in the group.
         
-        Return the results in the SearchResult format. You MUST use the web search tool."""
+        Return the results in the SearchResult format. You MUST use the search tools."""
 
 
-def create_kid_friendly_activity_agent() -> Agent[TripContext]:
-    """Create an agent specialized in finding kid-friendly activities."""
+def create_kid_friendly_activity_agent(
+    search_backend: SearchBackend = SearchBackend.LOCAL, hosted_fallback: bool = True
+) -> Agent[TripContext]:
+    """Create an agent specialized in finding kid-friendly activities using the given search backend."""
     return Agent[TripContext](
         name="Kid-Friendly Activity Agent",
         instructions=PROMPT,
         output_type=SearchResult,
-        tools=[WebSearchTool()],
+        tools=get_search_tools(search_backend, hosted_fallback),
         model="gpt-4o",
     )
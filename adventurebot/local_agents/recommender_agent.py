@@ -4,7 +4,7 @@ from typing import List, Optional
 from pydantic import BaseModel
 
 from agents import Agent
-from models import TripContext
+from models import TripContext, ItineraryContext
 
 PROMPT = """You evaluate potential activities and create a final travel plan.
         
@@ -19,7 +19,7 @@ PROMPT = """You evaluate potential activities and create a final travel plan.
            - Include a clear reasoning for why it's a good fit.
            - Suggest the best time/day if possible.
            - List weather considerations and preparation tips.
-           - Preserve the source URL.
+           - Preserve the source URL when the activity has one; never invent one.
         4. Summarize the key weather information.
         5. Generate a suggested packing list based on weather and activities.
         6. Add general travel tips relevant to the location or type of trip.
@@ -27,6 +27,27 @@ PROMPT = """You evaluate potential activities and create a final travel plan.
         
         Focus on creating a practical, enjoyable, and well-reasoned plan for the specific group."""
 
+ITINERARY_PROMPT = """You evaluate potential activities for every leg of a multi-destination trip and create one consolidated travel plan.
+        
+        Given, for each leg, the location, dates, weather analysis (WeatherAnalysis) and potential activities (ActivityResults), plus the participant details:
+        1. Evaluate each leg's activities based on:
+           - Suitability for the participant ages.
+           - Appropriateness considering that leg's weather summary.
+           - Group enjoyment potential (can everyone participate?).
+           - Practical considerations (cost, duration, accessibility inferred from description).
+        2. For each leg, select the top 3-5 activities and create a detailed recommendation (ActivityRecommendation) for each:
+           - Include a clear reasoning for why it's a good fit.
+           - Suggest the best time/day within that leg's dates if possible.
+           - List weather considerations and preparation tips.
+           - Preserve the source URL when the activity has one; never invent one.
+        3. Summarize the key weather information of each leg.
+        4. Avoid recommending near-identical activities in several legs; keep the overall trip varied.
+        5. Generate a single packing list that covers the weather and activities of all legs.
+        6. Add general travel tips, including tips for traveling between the legs.
+        7. Compile everything into the final ItineraryPlan format, keeping the legs in the given order.
+        
+        Focus on creating a practical, enjoyable, and well-reasoned plan for the specific group."""
+
 
 class ActivityRecommendation(BaseModel):
     """Detailed activity recommendation based on evaluation"""
@@ -52,6 +73,24 @@ class TripPlan(BaseModel):
     general_tips: List[str]
 
 
+class LegPlan(BaseModel):
+    """Evaluated recommendations for a single leg of an itinerary"""
+
+    location: str
+    dates: str  # e.g., "YYYY-MM-DD to YYYY-MM-DD"
+    weather_summary: str
+    recommended_activities: List[ActivityRecommendation]
+
+
+class ItineraryPlan(BaseModel):
+    """Consolidated plan covering every leg of a multi-destination trip"""
+
+    participants_summary: str  # e.g., "2 adults, 1 child (age 8)"
+    legs: List[LegPlan]
+    packing_list: List[str]
+    general_tips: List[str]
+
+
 def create_recommendation_agent() -> Agent[TripContext]:
     """Create an agent that evaluates activities and generates final trip recommendations."""
     return Agent[TripContext](
@@ -60,3 +99,13 @@ def create_recommendation_agent() -> Agent[TripContext]:
         output_type=TripPlan,
         model="gpt-4o",
     )
+
+
+def create_itinerary_recommendation_agent() -> Agent[ItineraryContext]:
+    """Create an agent that evaluates activities of all itinerary legs and generates one consolidated plan."""
+    return Agent[ItineraryContext](
+        name="Itinerary Recommendation Agent",
+        instructions=ITINERARY_PROMPT,
+        output_type=ItineraryPlan,
+        model="gpt-4o",
+    )
@@ -1,8 +1,9 @@
 """Agent for performing web searches to find activities and information."""
 
-from agents import Agent, WebSearchTool, handoff
+from agents import Agent, handoff
 from models import TripContext, CHILD_AGE_THRESHOLD, ActivityResult, SearchResult
 from tools.context_tools import check_child_threshold_status
+from tools.search_tools import SearchBackend, get_search_tools
 
 PROMPT = f"""You research and find suitable activities for a trip based on provided details.
 
@@ -15,31 +16,37 @@ PROMPT = f"""You research and find suitable activities for a trip based on provi
 
                 2. **If no young children (threshold not met):**
                     a. Internally brainstorm 3-5 relevant search queries focusing on general activities, age-appropriate options (for the adult/older group), weather suitability, and local experiences.
-                    b. Execute searches using the **WebSearchTool**.
+                    b. Execute searches using the `search_local_activities` tool when it is available. Use web search only if the local tool is not available or has no results for the destination.
                     c. For each promising activity found, extract and structure key information:
                         - Name and description
                         - Location
                         - Price range (if available)
                         - Duration (if available)
                         - Weather dependency
-                        - Source URL
+                        - Source URL (if available; results from the local index have none)
                     d. Compile a list of structured ActivityResult objects.
                     e. Provide a concise summary of your findings.
 
-            Return the results in the SearchResult format. You MUST use the web search tool."""
+            Return the results in the SearchResult format. You MUST use the search tools."""
 
 
-def create_activity_search_agent() -> Agent[TripContext]:
-    """Create an agent that searches for activities, uses tools, and hands off based on context."""
+def create_activity_search_agent(
+    search_backend: SearchBackend = SearchBackend.LOCAL, hosted_fallback: bool = True
+) -> Agent[TripContext]:
+    """Create an agent that searches for activities, uses tools, and hands off based on context.
+
+    With the local backend, activities come from the indexed corpus and the hosted
+    WebSearchTool is only attached as a fallback when `hosted_fallback` is set.
+    """
 
     from .kid_friendly_agent import create_kid_friendly_activity_agent  # Import locally to avoid potential circular dependency
-    kid_friendly_agent = create_kid_friendly_activity_agent()
+    kid_friendly_agent = create_kid_friendly_activity_agent(search_backend, hosted_fallback)
 
     return Agent[TripContext](
         name="Activity Search Agent",
         instructions=PROMPT,
         output_type=SearchResult,
-        tools=[WebSearchTool(), check_child_threshold_status],
+        tools=[*get_search_tools(search_backend, hosted_fallback), check_child_threshold_status],
         handoffs=[handoff(kid_friendly_agent)],
         model="gpt-4o", 
     )
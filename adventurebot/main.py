@@ -2,20 +2,75 @@
 
 from dotenv import load_dotenv
 
+import argparse
 import asyncio
 
 from manager import AdventureManager
-from models import TripQuery
+from models import TripQuery, ItineraryQuery, TripLeg
+from tools.search_tools import SearchBackend
 
 
 load_dotenv()
 
 
-async def main() -> None:
+def parse_args() -> argparse.Namespace:
+    """Parse command line options for the AdventureBot application."""
+    parser = argparse.ArgumentParser(description="Plan an adventure with AdventureBot")
+    parser.add_argument(
+        "--search-backend",
+        choices=[backend.value for backend in SearchBackend],
+        default=SearchBackend.LOCAL.value,
+        help="Activity search backend: the local indexed corpus or the hosted web search",
+    )
+    parser.add_argument(
+        "--no-web-fallback",
+        action="store_true",
+        help="Do not give the local search backend access to the hosted web search (local backend only)",
+    )
+    parser.add_argument(
+        "--itinerary",
+        action="store_true",
+        help="Plan the sample multi-destination itinerary instead of the single-destination trip",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="profiles",
+        default=None,
+        metavar="DIR",
+        help="Record timing spans of the run and write a Chrome trace file to DIR (default: profiles)",
+    )
+    args = parser.parse_args()
+
+    if args.no_web_fallback and args.search_backend == SearchBackend.HOSTED.value:
+        parser.error("--no-web-fallback only applies to the local search backend")
+    return args
+
+
+async def main(args: argparse.Namespace) -> None:
     """
     Main entry point for the AdventureBot application.
     Creates a sample trip query and runs the adventure planning process.
     """
+    manager = AdventureManager(
+        search_backend=SearchBackend(args.search_backend),
+        hosted_fallback=not args.no_web_fallback,
+        profile_dir=args.profile,
+    )
+
+    if args.itinerary:
+        # Sample multi-destination itinerary data
+        itinerary = ItineraryQuery(
+            legs=[
+                TripLeg(location="Barcelona", start_date="2025-06-05", end_date="2025-06-09"),
+                TripLeg(location="Paris", start_date="2025-06-10", end_date="2025-06-14"),
+            ],
+            participant_number=3,
+            participant_ages=[32, 35, 10],
+        )
+        await manager.run_itinerary(itinerary)
+        return
+
     # Sample trip query data
     query = TripQuery(
         start_date="2025-06-05",
@@ -25,9 +80,9 @@ async def main() -> None:
         participant_ages=[32, 35, 10],
     )
 
-    # Initialize and run the adventure manager
-    await AdventureManager().run(query)
+    # Run the adventure manager
+    await manager.run(query)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(main(parse_args()))
@@ -1,25 +1,51 @@
 """Module for managing the adventure planning workflow and coordinating agent interactions."""
 
+import asyncio
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
 from agents import Runner, trace, gen_trace_id, Agent
 from agents.result import RunResult
-from agents.mcp import MCPServerStdio
-from models import TripQuery, TripContext
+from agents.mcp import MCPServer, MCPServerStdio
+import profiling
+from models import TripQuery, TripContext, ItineraryQuery, ItineraryContext
+from tools.search_tools import SearchBackend, normalize_location
 from local_agents import (
     create_weather_agent,
     WeatherAnalysis,
     create_recommendation_agent,
     TripPlan,
+    create_itinerary_recommendation_agent,
+    ItineraryPlan,
+    ActivityRecommendation,
     create_activity_search_agent,
     SearchResult,
 )
 
+# In-flight and finished weather lookups of one itinerary run, keyed by weather_cache_key
+WeatherTasks = Dict[Tuple[str, str, str], "asyncio.Task[WeatherAnalysis]"]
+
+
+def weather_cache_key(query: TripQuery) -> Tuple[str, str, str]:
+    """Key under which legs share a weather lookup: the normalized location and the dates."""
+    return normalize_location(query.location), query.start_date, query.end_date
+
 
 class AdventureManager:
     """Manages the simplified adventure planning workflow with custom tool examples."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        search_backend: SearchBackend = SearchBackend.LOCAL,
+        hosted_fallback: bool = True,
+        profile_dir: Optional[Path] = None,
+    ):
+        """Set up the agents; if `profile_dir` is given, every run writes a Chrome trace profile there."""
+        self.profile_dir = Path(profile_dir) if profile_dir is not None else None
         self.recommendation_agent: Agent[TripContext] = create_recommendation_agent()
-        self.activity_search_agent: Agent[TripContext] = create_activity_search_agent()
+        self.itinerary_recommendation_agent: Agent[ItineraryContext] = create_itinerary_recommendation_agent()
+        self.activity_search_agent: Agent[TripContext] = create_activity_search_agent(search_backend, hosted_fallback)
 
     async def run(self, query: TripQuery) -> None:
         """Run the simplified adventure planning workflow"""
@@ -32,7 +58,9 @@ class AdventureManager:
         # Create the context object
         trip_context = TripContext(query=query)
 
-        with trace("Adventure Planning (Simplified)", trace_id=trace_id):
+        with trace("Adventure Planning (Simplified)", trace_id=trace_id), profiling.profile_run(
+            trace_id, self.profile_dir
+        ):
             # 1. Get Weather Information
             weather_info = await self._get_weather_info(trip_context)
 
@@ -45,34 +73,134 @@ class AdventureManager:
             # Display the final trip plan
             self._print_trip_plan(trip_plan)
 
-    async def _get_weather_info(self, context: TripContext) -> WeatherAnalysis:
-        """Run the WeatherAgent to get weather information, managing MCP server lifecycle."""
-        print("Initializing and connecting to Weather MCP server...")
+    async def run_itinerary(self, query: ItineraryQuery) -> None:
+        """Run the adventure planning workflow for a multi-destination itinerary.
+
+        Weather and activity search run concurrently for all legs over a single Weather MCP
+        server connection, followed by one recommendation pass producing a consolidated plan.
+        """
+        trace_id = gen_trace_id()
+        print(f"Starting itinerary planning for {len(query.legs)} legs... (Trace ID: {trace_id})")
+        print(
+            f"View trace: https://platform.openai.com/traces/trace?trace_id={trace_id}"
+        )
 
-        # Define and connect to the Weather MCP server
-        weather_mcp_server = MCPServerStdio(
+        # Create one context per leg, plus the itinerary-wide context for the recommendation pass
+        leg_contexts = [TripContext(query=query.leg_query(leg)) for leg in query.legs]
+        itinerary_context = ItineraryContext(query=query, leg_contexts=leg_contexts)
+
+        with trace("Adventure Planning (Itinerary)", trace_id=trace_id), profiling.profile_run(
+            trace_id, self.profile_dir
+        ):
+            # 1. Get weather information and search for activities, all legs at once.
+            # If a leg fails, the task group cancels the others before the shared server is closed.
+            # Weather lookups are only shared within this run, so every run fetches fresh weather.
+            weather_tasks: WeatherTasks = {}
+            async with self._connect_weather_mcp_server() as server:
+                async with asyncio.TaskGroup() as task_group:
+                    leg_tasks = [
+                        task_group.create_task(self._plan_leg(leg_context, server, weather_tasks))
+                        for leg_context in leg_contexts
+                    ]
+            leg_results = [leg_task.result() for leg_task in leg_tasks]
+
+            # 2. Generate the consolidated plan in a single recommendation pass
+            itinerary_plan = await self._generate_itinerary_plan(leg_results, itinerary_context)
+
+            # Display the final itinerary plan
+            self._print_itinerary_plan(itinerary_plan)
+
+    async def _plan_leg(
+        self, context: TripContext, weather_server: MCPServer, weather_tasks: WeatherTasks
+    ) -> Tuple[WeatherAnalysis, SearchResult]:
+        """Get the weather and then search for activities for a single itinerary leg."""
+        with profiling.span("itinerary_leg", location=context.query.location):
+            weather_info = await self._get_shared_weather_info(context, weather_server, weather_tasks)
+            search_results, _ = await self._search_for_activities(context, weather_info)
+        return weather_info, search_results
+
+    def _create_weather_mcp_server(self) -> MCPServerStdio:
+        """Define the Weather MCP server, run as a docker container over stdio.
+
+        When profiling, the container gets the trace id and a mounted profile directory,
+        so its tool call spans can be merged into the run's profile.
+        """
+        docker_args = ["run", "--rm", "-i"]
+        profiler = profiling.current_profiler()
+        if profiler is not None:
+            profiler.output_dir.mkdir(parents=True, exist_ok=True)
+            docker_args += [
+                "-e", f"MCP_WEATHER_TRACE_ID={profiler.trace_id}",
+                "-e", "MCP_WEATHER_PROFILE_DIR=/profiles",
+                "-v", f"{profiler.output_dir.resolve()}:/profiles",
+            ]
+            profiler.expects_mcp_server_profile = True
+        docker_args.append("mcp_server_weather")
+
+        return MCPServerStdio(
             params={
                 "command": "docker",
-                "args": ["run", "--rm", "-i", "mcp_server_weather"],
+                "args": docker_args,
             }
         )
 
-        async with weather_mcp_server as server:
-            print("Weather MCP server connected. Creating weather agent...")
-            weather_agent = create_weather_agent(mcp_servers=[server])
+    @asynccontextmanager
+    async def _connect_weather_mcp_server(self) -> AsyncIterator[MCPServer]:
+        """Connect to the Weather MCP server for the duration of the block, managing its lifecycle."""
+        print("Initializing and connecting to Weather MCP server...")
+        server = self._create_weather_mcp_server()
 
-            print("Fetching weather information using Weather Agent...")
-            input_str = (
-                f"Get weather analysis for a trip to {context.query.location} "
-                f"from {context.query.start_date} to {context.query.end_date}."
-            )
+        # Includes the docker container startup and the MCP initialization handshake
+        with profiling.span("weather_mcp.connect"):
+            await server.connect()
+        print("Weather MCP server connected.")
 
-            result = await Runner.run(weather_agent, input_str, context=context)
+        try:
+            yield server
+        finally:
+            with profiling.span("weather_mcp.cleanup"):
+                await server.cleanup()
+            print("Weather MCP server disconnected.")
+
+    async def _get_weather_info(self, context: TripContext) -> WeatherAnalysis:
+        """Run the WeatherAgent to get weather information, managing MCP server lifecycle."""
+        async with self._connect_weather_mcp_server() as server:
+            return await self._fetch_weather_info(context, server)
+
+    async def _get_shared_weather_info(
+        self, context: TripContext, weather_server: MCPServer, weather_tasks: WeatherTasks
+    ) -> WeatherAnalysis:
+        """Get weather information for an itinerary leg, sharing lookups between legs of the same run.
+
+        Legs with the same location and dates await a single WeatherAgent run, even while it is
+        still in flight. `weather_tasks` belongs to one `run_itinerary` call and is dropped with it.
+        """
+        cache_key = weather_cache_key(context.query)
+        weather_task = weather_tasks.get(cache_key)
+        if weather_task is not None:
+            print(f"Reusing weather lookup for {context.query.location}.")
+            return await weather_task
+
+        # Store the task before awaiting it, so concurrent legs with the same key wait on it
+        weather_task = asyncio.create_task(self._fetch_weather_info(context, weather_server))
+        weather_tasks[cache_key] = weather_task
+        return await weather_task
+
+    async def _fetch_weather_info(self, context: TripContext, weather_server: MCPServer) -> WeatherAnalysis:
+        """Run the WeatherAgent against a connected Weather MCP server."""
+        weather_agent = create_weather_agent(mcp_servers=[weather_server])
+
+        print(f"Fetching weather information for {context.query.location} using Weather Agent...")
+        input_str = (
+            f"Get weather analysis for a trip to {context.query.location} "
+            f"from {context.query.start_date} to {context.query.end_date}."
+        )
 
-            weather_info = result.final_output_as(WeatherAnalysis)
-            print("Weather information fetched.")
+        with profiling.span("weather.agent_run", location=context.query.location):
+            result = await Runner.run(weather_agent, input_str, context=context)
 
-        print("Weather MCP server disconnected.")
+        weather_info = result.final_output_as(WeatherAnalysis)
+        print(f"Weather information for {context.query.location} fetched.")
         return weather_info
 
     async def _generate_trip_plan(
@@ -92,15 +220,47 @@ class AdventureManager:
             f"Detailed activity list: {[activity.model_dump() for activity in search_results.activities]}"
         )
 
-        result = await Runner.run(self.recommendation_agent, input_str, context=context)
+        with profiling.span("recommendation.agent_run"):
+            result = await Runner.run(self.recommendation_agent, input_str, context=context)
 
         trip_plan = result.final_output_as(TripPlan)
         print("Trip plan generated.")
         return trip_plan
 
+    async def _generate_itinerary_plan(
+        self,
+        leg_results: List[Tuple[WeatherAnalysis, SearchResult]],
+        context: ItineraryContext,
+    ) -> ItineraryPlan:
+        """Run the ItineraryRecommendationAgent over all legs to create one consolidated plan."""
+        print("Evaluating activities and creating itinerary plan...")
+
+        # Prepare input string including every leg's weather and activities
+        participants_str = f"{context.query.participant_number} participants (ages: {context.query.participant_ages})"
+        legs_str = "\n\n".join(
+            f"Leg {i}: {leg_context.query.location} from {leg_context.query.start_date} to {leg_context.query.end_date}\n"
+            f"Weather Information:\n{weather_info.model_dump()}\n"
+            f"Potential Activities:\n{search_results.search_summary}\n"
+            f"Detailed activity list: {[activity.model_dump() for activity in search_results.activities]}"
+            for i, (leg_context, (weather_info, search_results)) in enumerate(
+                zip(context.leg_contexts, leg_results), start=1
+            )
+        )
+        input_str = (
+            f"Create a trip plan for a {len(context.leg_contexts)}-leg itinerary "
+            f"for {participants_str}.\n\n{legs_str}"
+        )
+
+        with profiling.span("itinerary_recommendation.agent_run"):
+            result = await Runner.run(self.itinerary_recommendation_agent, input_str, context=context)
+
+        itinerary_plan = result.final_output_as(ItineraryPlan)
+        print("Itinerary plan generated.")
+        return itinerary_plan
+
     async def _search_for_activities(self, context: TripContext, weather_info: WeatherAnalysis) -> tuple[SearchResult, Agent]:
         """Search for activities based on weather information and trip details."""
-        print("Searching for activities...")
+        print(f"Searching for activities in {context.query.location}...")
 
         input_str = (
             f"Search for activities for a trip in {context.query.location} from {context.query.start_date} to {context.query.end_date}. "
@@ -108,16 +268,17 @@ class AdventureManager:
             f" Consider the weather information: {weather_info.model_dump()}"
         )
 
-        result = await Runner.run(self.activity_search_agent, input_str, context=context)
+        with profiling.span("search.agent_run", location=context.query.location):
+            result = await Runner.run(self.activity_search_agent, input_str, context=context)
 
         activity_result = result.final_output_as(SearchResult)
         final_agent = result.last_agent
 
         # Log if a handoff occurred
         if final_agent.name != self.activity_search_agent.name:
-            print(f"Handoff occurred: Activities found by {final_agent.name}.")
+            print(f"Handoff occurred: Activities in {context.query.location} found by {final_agent.name}.")
         else:
-            print(f"Activity search complete (using {final_agent.name}).")
+            print(f"Activity search in {context.query.location} complete (using {final_agent.name}).")
 
         return activity_result, final_agent
 
@@ -130,12 +291,31 @@ class AdventureManager:
 
         print(f"Weather Summary:\n{plan.weather_summary}\n")
 
+        self._print_recommended_activities(plan.recommended_activities)
+
+        self._print_packing_and_tips(plan.packing_list, plan.general_tips)
+
+    def _print_itinerary_plan(self, plan: ItineraryPlan) -> None:
+        """Print the consolidated itinerary plan in a structured format."""
+        print("\n=== Your Adventure Itinerary ===\n")
+        print(f"Participants: {plan.participants_summary}")
+
+        for i, leg in enumerate(plan.legs, start=1):
+            print(f"\n--- Leg {i}: {leg.location} ---")
+            print(f"Dates: {leg.dates}\n")
+            print(f"Weather Summary:\n{leg.weather_summary}\n")
+            self._print_recommended_activities(leg.recommended_activities)
+
+        self._print_packing_and_tips(plan.packing_list, plan.general_tips)
+
+    def _print_recommended_activities(self, activities: List[ActivityRecommendation]) -> None:
+        """Print recommended activities with their reasoning and tips."""
         print("Recommended Activities:")
-        if not plan.recommended_activities:
+        if not activities:
             print(
                 "- No specific activities recommended based on search and evaluation."
             )
-        for activity in plan.recommended_activities:
+        for activity in activities:
             print(f"\n- {activity.name}")
             print(f"  Description: {activity.description}")
             print(f"  Reasoning: {activity.reasoning}")
@@ -152,14 +332,16 @@ class AdventureManager:
                 for tip in activity.preparation_tips:
                     print(f"    - {tip}")
 
+    def _print_packing_and_tips(self, packing_list: List[str], general_tips: List[str]) -> None:
+        """Print the packing list and general tips."""
         print("\nPacking List:")
-        if not plan.packing_list:
+        if not packing_list:
             print("- No specific packing items suggested.")
-        for item in plan.packing_list:
+        for item in packing_list:
             print(f"- {item}")
 
         print("\nGeneral Tips:")
-        if not plan.general_tips:
+        if not general_tips:
             print("- No general tips provided.")
-        for tip in plan.general_tips:
+        for tip in general_tips:
             print(f"- {tip}")
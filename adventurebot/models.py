@@ -17,6 +17,32 @@ class TripQuery(BaseModel):
     participant_ages: List[int]
 
 
+class TripLeg(BaseModel):
+    """A single destination of a multi-leg itinerary"""
+
+    location: str
+    start_date: str  # YYYY-MM-DD format
+    end_date: str  # YYYY-MM-DD format
+
+
+class ItineraryQuery(BaseModel):
+    """Input data structure for planning a trip across several destinations"""
+
+    legs: List[TripLeg] = Field(min_length=1)
+    participant_number: int
+    participant_ages: List[int]
+
+    def leg_query(self, leg: TripLeg) -> TripQuery:
+        """Build the single-destination query for one leg, sharing the participant details."""
+        return TripQuery(
+            start_date=leg.start_date,
+            end_date=leg.end_date,
+            location=leg.location,
+            participant_number=self.participant_number,
+            participant_ages=self.participant_ages,
+        )
+
+
 class TripContext(BaseModel):
     """Context object holding trip details and derived information."""
 
@@ -27,6 +53,13 @@ class TripContext(BaseModel):
     )
 
 
+class ItineraryContext(BaseModel):
+    """Context object holding the itinerary and the per-leg trip contexts."""
+
+    query: ItineraryQuery
+    leg_contexts: List[TripContext]
+
+
 # --- Moved Models ---
 
 
@@ -0,0 +1,219 @@
+"""Opt-in profiling of the planning pipeline, recorded as async-task-aware spans and written as Chrome trace files."""
+
+import asyncio
+import itertools
+import json
+import os
+import time
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from agents import Span, Trace, TracingProcessor, add_trace_processor
+
+# Name pattern of the span files written by the Weather MCP server, merged into the run's profile
+MCP_SERVER_PROFILE_GLOB = "mcp-weather-{trace_id}-*.json"
+
+_current_profiler: ContextVar[Optional["Profiler"]] = ContextVar("current_profiler", default=None)
+_active_profilers: Dict[str, "Profiler"] = {}
+_sdk_recorder_registered = False
+
+
+def _now_us() -> int:
+    # Wall-clock time, so spans recorded by the MCP server process line up with ours
+    return time.time_ns() // 1000
+
+
+class Profiler:
+    """Collects timing spans of one planning run in the Chrome trace event format.
+
+    Each asyncio task gets its own track, so concurrently running stages show up side by side.
+    """
+
+    def __init__(self, trace_id: str, output_dir: Path):
+        self.trace_id = trace_id
+        self.output_dir = Path(output_dir)
+        self._pid = os.getpid()
+        self._events: List[Dict[str, Any]] = [
+            {"ph": "M", "name": "process_name", "pid": self._pid, "tid": 0, "args": {"name": "adventurebot"}}
+        ]
+        self._task_tids: "weakref.WeakKeyDictionary[asyncio.Task, int]" = weakref.WeakKeyDictionary()
+        self._next_tid = itertools.count(1)
+        self._open_spans: Dict[str, Tuple[str, str, Dict[str, Any], int, int]] = {}
+        # Set once a Weather MCP server was started with profiling enabled, so its spans are expected
+        self.expects_mcp_server_profile = False
+
+    def _current_tid(self) -> int:
+        """Return the track id of the running asyncio task, registering new tasks as they appear."""
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        if task is None:
+            return 0
+
+        tid = self._task_tids.get(task)
+        if tid is None:
+            tid = next(self._next_tid)
+            self._task_tids[task] = tid
+            self._events.append(
+                {"ph": "M", "name": "thread_name", "pid": self._pid, "tid": tid, "args": {"name": task.get_name()}}
+            )
+        return tid
+
+    def _add_complete_event(
+        self, name: str, category: str, args: Dict[str, Any], start_us: int, tid: int
+    ) -> None:
+        self._events.append(
+            {
+                "ph": "X",
+                "name": name,
+                "cat": category,
+                "ts": start_us,
+                "dur": _now_us() - start_us,
+                "pid": self._pid,
+                "tid": tid,
+                "args": {"trace_id": self.trace_id, **args},
+            }
+        )
+
+    @contextmanager
+    def span(self, name: str, category: str = "manager", **args: Any) -> Iterator[None]:
+        """Record the duration of the enclosed block as a span on the current task's track."""
+        tid = self._current_tid()
+        start_us = _now_us()
+        try:
+            yield
+        finally:
+            self._add_complete_event(name, category, args, start_us, tid)
+
+    def begin_span(self, key: str, name: str, category: str, **args: Any) -> None:
+        """Open a span that is closed later by `end_span`, for callers that can't use a with block."""
+        self._open_spans[key] = (name, category, args, _now_us(), self._current_tid())
+
+    def end_span(self, key: str) -> None:
+        """Close a span opened by `begin_span`."""
+        open_span = self._open_spans.pop(key, None)
+        if open_span is not None:
+            name, category, args, start_us, tid = open_span
+            self._add_complete_event(name, category, args, start_us, tid)
+
+    def _collect_mcp_server_events(self) -> List[Dict[str, Any]]:
+        """Read and remove the span files the Weather MCP server wrote for this trace id."""
+        events: List[Dict[str, Any]] = []
+        for path in sorted(self.output_dir.glob(MCP_SERVER_PROFILE_GLOB.format(trace_id=self.trace_id))):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    events.extend(json.load(f).get("traceEvents", []))
+                path.unlink()
+            except (OSError, ValueError) as e:
+                print(f"Could not merge MCP server profile {path}: {e}")
+
+        if not events and self.expects_mcp_server_profile:
+            print(
+                f"No MCP server profile ({MCP_SERVER_PROFILE_GLOB.format(trace_id=self.trace_id)}) found "
+                f"in {self.output_dir}; the profile only covers the client side."
+            )
+        return events
+
+    def write(self) -> Path:
+        """Write the recorded spans, merged with the MCP server's, to a Chrome trace file."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        path = self.output_dir / f"adventure-{self.trace_id}.json"
+        trace_data = {
+            "traceEvents": self._events + self._collect_mcp_server_events(),
+            "displayTimeUnit": "ms",
+            "otherData": {"trace_id": self.trace_id},
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(trace_data, f)
+        return path
+
+
+class _SDKSpanRecorder(TracingProcessor):
+    """Forwards Agents SDK spans (agent runs, model responses, tool calls) to the profiler of their trace."""
+
+    def on_trace_start(self, trace: Trace) -> None:
+        pass
+
+    def on_trace_end(self, trace: Trace) -> None:
+        pass
+
+    def on_span_start(self, span: Span[Any]) -> None:
+        profiler = _active_profilers.get(span.trace_id)
+        if profiler is None:
+            return
+
+        span_type = span.span_data.type
+        span_name = getattr(span.span_data, "name", None) or getattr(span.span_data, "server", None)
+        profiler.begin_span(
+            span.span_id,
+            f"{span_type}: {span_name}" if span_name else span_type,
+            "agents-sdk",
+            span_id=span.span_id,
+            parent_id=span.parent_id,
+        )
+
+    def on_span_end(self, span: Span[Any]) -> None:
+        profiler = _active_profilers.get(span.trace_id)
+        if profiler is not None:
+            profiler.end_span(span.span_id)
+
+    def shutdown(self) -> None:
+        pass
+
+    def force_flush(self) -> None:
+        pass
+
+
+def current_profiler() -> Optional[Profiler]:
+    """Return the profiler of the run executing in the current context, if profiling is enabled."""
+    return _current_profiler.get()
+
+
+@contextmanager
+def span(name: str, category: str = "manager", **args: Any) -> Iterator[None]:
+    """Record a span with the current run's profiler; does nothing when profiling is disabled."""
+    profiler = _current_profiler.get()
+    if profiler is None:
+        yield
+        return
+
+    with profiler.span(name, category, **args):
+        yield
+
+
+@contextmanager
+def profile_run(trace_id: str, output_dir: Optional[Path]) -> Iterator[Optional[Profiler]]:
+    """Profile the enclosed planning run and write its trace file on exit.
+
+    Profiling is disabled when `output_dir` is None, in which case None is yielded.
+    """
+    global _sdk_recorder_registered
+
+    if output_dir is None:
+        yield None
+        return
+
+    if not _sdk_recorder_registered:
+        add_trace_processor(_SDKSpanRecorder())
+        _sdk_recorder_registered = True
+
+    profiler = Profiler(trace_id, output_dir)
+    token = _current_profiler.set(profiler)
+    _active_profilers[trace_id] = profiler
+    try:
+        with profiler.span("planning_run"):
+            yield profiler
+    finally:
+        _current_profiler.reset(token)
+        _active_profilers.pop(trace_id, None)
+        # A failed write must neither fail a successful run nor hide the run's own exception
+        try:
+            path = profiler.write()
+        except OSError as e:
+            print(f"Warning: could not write profile to {profiler.output_dir}: {e}")
+        else:
+            print(f"Profile written to {path} (open with chrome://tracing or https://www.speedscope.app)")
@@ -0,0 +1,76 @@
+"""Tests for the AdventureManager helpers that don't call the model."""
+
+import asyncio
+
+from manager import AdventureManager, weather_cache_key
+from models import TripContext, TripQuery
+from local_agents import WeatherAnalysis
+
+
+def make_context(location: str, start_date: str = "2025-06-05", end_date: str = "2025-06-09") -> TripContext:
+    return TripContext(
+        query=TripQuery(
+            start_date=start_date,
+            end_date=end_date,
+            location=location,
+            participant_number=2,
+            participant_ages=[30, 31],
+        )
+    )
+
+
+class CountingManager(AdventureManager):
+    """AdventureManager whose weather fetch is a slow local stub that counts its calls."""
+
+    def __init__(self):
+        super().__init__()
+        self.fetched_locations = []
+
+    async def _fetch_weather_info(self, context, weather_server):
+        self.fetched_locations.append(context.query.location)
+        await asyncio.sleep(0.01)
+        return WeatherAnalysis(
+            summary=f"Sunny in {context.query.location}",
+            temperature_range=[15.0, 25.0],
+            precipitation_chance=0.1,
+            recommended_clothing=["t-shirt"],
+        )
+
+
+def test_weather_cache_key_normalizes_location():
+    assert weather_cache_key(make_context("Bogotá").query) == weather_cache_key(make_context("Bogota, Colombia").query)
+    assert weather_cache_key(make_context("Bogota").query) != weather_cache_key(
+        make_context("Bogota", start_date="2025-07-01").query
+    )
+
+
+def test_concurrent_legs_share_weather_lookup():
+    manager = CountingManager()
+    weather_tasks = {}
+
+    async def plan():
+        return await asyncio.gather(
+            *(
+                manager._get_shared_weather_info(make_context(location), None, weather_tasks)
+                for location in ["Bogotá", "Bogota, Colombia", "Paris"]
+            )
+        )
+
+    bogota, bogota_again, paris = asyncio.run(plan())
+
+    assert sorted(manager.fetched_locations) == ["Bogotá", "Paris"]
+    assert bogota is bogota_again
+    assert paris.summary == "Sunny in Paris"
+
+
+def test_weather_lookups_are_not_shared_across_runs():
+    manager = CountingManager()
+
+    async def plan():
+        # Each run_itinerary call starts with its own, empty task dict
+        for _ in range(2):
+            await manager._get_shared_weather_info(make_context("Paris"), None, {})
+
+    asyncio.run(plan())
+
+    assert manager.fetched_locations == ["Paris", "Paris"]
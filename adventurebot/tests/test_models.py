@@ -0,0 +1,28 @@
+"""Tests for the trip and itinerary data models."""
+
+import pytest
+from pydantic import ValidationError
+
+from models import ItineraryQuery, TripLeg, TripQuery
+
+
+def make_itinerary(*legs: TripLeg) -> ItineraryQuery:
+    return ItineraryQuery(legs=list(legs), participant_number=3, participant_ages=[32, 35, 10])
+
+
+def test_leg_query_combines_leg_and_participants():
+    leg = TripLeg(location="Paris", start_date="2025-06-10", end_date="2025-06-14")
+    itinerary = make_itinerary(TripLeg(location="Barcelona", start_date="2025-06-05", end_date="2025-06-09"), leg)
+
+    assert itinerary.leg_query(leg) == TripQuery(
+        start_date="2025-06-10",
+        end_date="2025-06-14",
+        location="Paris",
+        participant_number=3,
+        participant_ages=[32, 35, 10],
+    )
+
+
+def test_itinerary_requires_a_leg():
+    with pytest.raises(ValidationError):
+        make_itinerary()
@@ -0,0 +1,84 @@
+"""Tests for the Chrome trace output of the profiling mode."""
+
+import asyncio
+import json
+
+import pytest
+
+import profiling
+
+
+def load_events(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["traceEvents"]
+
+
+def test_profile_run_disabled_writes_nothing(tmp_path):
+    with profiling.profile_run("trace_off", None) as profiler:
+        assert profiler is None
+        with profiling.span("ignored"):
+            pass
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_spans_get_one_track_per_task(tmp_path):
+    async def leg(location):
+        with profiling.span("itinerary_leg", location=location):
+            await asyncio.sleep(0.01)
+
+    async def run():
+        with profiling.profile_run("trace_tasks", tmp_path):
+            await asyncio.gather(leg("Paris"), leg("Rome"))
+
+    asyncio.run(run())
+    events = load_events(tmp_path / "adventure-trace_tasks.json")
+
+    span_names = [event["name"] for event in events if event["ph"] == "X"]
+    legs = [event for event in events if event["ph"] == "X" and event["name"] == "itinerary_leg"]
+    assert "planning_run" in span_names
+    assert {event["args"]["location"] for event in legs} == {"Paris", "Rome"}
+    assert all(event["args"]["trace_id"] == "trace_tasks" and event["dur"] >= 0 for event in legs)
+
+    # Concurrent legs run in different tasks, each named by a thread_name metadata event
+    leg_tids = {event["tid"] for event in legs}
+    named_tids = {event["tid"] for event in events if event["ph"] == "M" and event["name"] == "thread_name"}
+    assert len(leg_tids) == 2
+    assert leg_tids <= named_tids
+
+
+def test_mcp_server_spans_are_merged(tmp_path):
+    server_event = {"ph": "X", "name": "call_tool", "ts": 1, "dur": 2, "pid": 1, "tid": 1, "args": {}}
+    server_file = tmp_path / "mcp-weather-trace_merge-1.json"
+    server_file.write_text(json.dumps({"traceEvents": [server_event]}), encoding="utf-8")
+
+    with profiling.profile_run("trace_merge", tmp_path):
+        pass
+
+    assert server_event in load_events(tmp_path / "adventure-trace_merge.json")
+    assert not server_file.exists()
+
+
+def test_missing_mcp_server_spans_are_reported(tmp_path, capsys):
+    with profiling.profile_run("trace_missing", tmp_path) as profiler:
+        profiler.expects_mcp_server_profile = True
+
+    assert "No MCP server profile (mcp-weather-trace_missing-*.json)" in capsys.readouterr().out
+
+
+def test_write_error_does_not_fail_run(tmp_path, capsys):
+    not_a_dir = tmp_path / "profile"
+    not_a_dir.write_text("", encoding="utf-8")
+
+    with profiling.profile_run("trace_error", not_a_dir):
+        pass
+
+    assert "Warning: could not write profile" in capsys.readouterr().out
+
+
+def test_write_error_does_not_hide_run_error(tmp_path):
+    not_a_dir = tmp_path / "profile"
+    not_a_dir.write_text("", encoding="utf-8")
+
+    with pytest.raises(RuntimeError, match="planning failed"):
+        with profiling.profile_run("trace_error", not_a_dir):
+            raise RuntimeError("planning failed")
@@ -0,0 +1,92 @@
+"""Tests for the local activity search backend."""
+
+import json
+
+import pytest
+
+from tools.search_tools import (
+    DEFAULT_RESULT_LIMIT,
+    MAX_RESULT_LIMIT,
+    SearchBackend,
+    _cached_search,
+    _search_local_activities,
+    _to_match_expression,
+    clamp_result_limit,
+    get_activity_index,
+    get_search_tools,
+    normalize_location,
+    search_activities,
+)
+
+
+@pytest.mark.parametrize(
+    "location, expected",
+    [
+        ("Bogota", "bogota"),
+        ("  Bogotá ", "bogota"),
+        ("Bogota, Colombia", "bogota"),
+        ("BOGOTÁ, D.C., Colombia", "bogota"),
+        ("New York", "new york"),
+    ],
+)
+def test_normalize_location(location, expected):
+    assert normalize_location(location) == expected
+
+
+def test_match_expression_quotes_terms():
+    # FTS5 operators and quotes in user input must end up as plain quoted terms
+    assert _to_match_expression('museum" OR name:* NEAR(kids') == '"museum" OR "or" OR "name" OR "near" OR "kids"'
+    assert _to_match_expression("  ") == ""
+
+
+def test_search_ranks_matching_activities():
+    activities = get_activity_index().search("Bogota", "interactive science kids")
+    assert activities[0].name == "Maloka Interactive Science Center"
+    assert all(activity.location == "Bogota" for activity in activities)
+
+
+def test_search_accepts_accents_and_country():
+    assert json.loads(search_activities("Bogotá", "museum")) == json.loads(search_activities("Bogota, Colombia", "museum"))
+    assert json.loads(search_activities("Bogotá", "museum"))
+
+
+def test_search_falls_back_to_all_activities_of_known_city():
+    activities = json.loads(search_activities("Paris", "xyzzy"))
+    assert {activity["location"] for activity in activities} == {"Paris"}
+    assert len(activities) == len(get_activity_index().search("Paris", "", MAX_RESULT_LIMIT))
+
+
+@pytest.mark.parametrize(
+    "limit, expected",
+    [(None, DEFAULT_RESULT_LIMIT), (0, DEFAULT_RESULT_LIMIT), (-1, 1), (3, 3), (1000, MAX_RESULT_LIMIT)],
+)
+def test_clamp_result_limit(limit, expected):
+    assert clamp_result_limit(limit) == expected
+
+
+def test_tool_clamps_limit():
+    assert len(json.loads(_search_local_activities("Paris", "", -1))) == 1
+    assert len(json.loads(_search_local_activities("Paris", "", 1000))) <= MAX_RESULT_LIMIT
+
+
+def test_tool_reports_unknown_city():
+    assert _search_local_activities("Lima", "museum") == (
+        "No local activities indexed for Lima. Use web search if it is available."
+    )
+
+
+def test_search_reuses_cached_results():
+    _cached_search.cache_clear()
+    search_activities("Tokyo", "Temple, culture!")
+    search_activities(" tokyo ", "temple culture")
+    info = _cached_search.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+
+
+def test_search_tools_per_backend():
+    local_tools = get_search_tools(SearchBackend.LOCAL, hosted_fallback=True)
+    assert [tool.name for tool in local_tools] == ["search_local_activities", "web_search"]
+    assert [tool.name for tool in get_search_tools(SearchBackend.LOCAL, hosted_fallback=False)] == [
+        "search_local_activities"
+    ]
+    assert [tool.name for tool in get_search_tools("hosted")] == ["web_search"]
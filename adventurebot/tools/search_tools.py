@@ -0,0 +1,153 @@
+"""Activity search backends: a local full-text index with the hosted web search as optional fallback."""
+
+import json
+import re
+import sqlite3
+import unicodedata
+from enum import Enum
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional
+
+from agents import Tool, WebSearchTool, function_tool
+from models import ActivityResult
+
+ACTIVITY_CORPUS_PATH = Path(__file__).resolve().parent.parent / "data" / "activities.json"
+DEFAULT_RESULT_LIMIT = 8
+MAX_RESULT_LIMIT = 8
+SEARCH_CACHE_SIZE = 256
+
+
+class SearchBackend(str, Enum):
+    """Where the activity agents search for activities"""
+
+    LOCAL = "local"
+    HOSTED = "hosted"
+
+
+def normalize_location(location: str) -> str:
+    """Normalize a destination name for lookups, e.g. "Bogotá, Colombia" -> "bogota"."""
+    city = location.split(",", 1)[0]
+    decomposed = unicodedata.normalize("NFKD", city)
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).strip().casefold()
+
+
+class ActivityIndex:
+    """In-memory SQLite FTS5 index over the curated activity corpus."""
+
+    def __init__(self, corpus_path: Path = ACTIVITY_CORPUS_PATH):
+        with open(corpus_path, encoding="utf-8") as f:
+            records = json.load(f)
+
+        # The index is built once and only read afterwards, so it can be shared across threads
+        self._conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self._conn.execute(
+            "CREATE VIRTUAL TABLE activities USING fts5("
+            "name, description, tags, location UNINDEXED, payload UNINDEXED, "
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        self._conn.executemany(
+            "INSERT INTO activities (name, description, tags, location, payload) VALUES (?, ?, ?, ?, ?)",
+            [
+                (
+                    record["name"],
+                    record["description"],
+                    record.get("tags", ""),
+                    normalize_location(record["location"]),
+                    ActivityResult.model_validate(record).model_dump_json(),
+                )
+                for record in records
+            ],
+        )
+        self._locations = {normalize_location(record["location"]) for record in records}
+
+    def has_location(self, location: str) -> bool:
+        """Return True if the corpus covers the given destination."""
+        return normalize_location(location) in self._locations
+
+    def search(self, location: str, query: str = "", limit: int = DEFAULT_RESULT_LIMIT) -> List[ActivityResult]:
+        """Return the best matching activities for a destination, ranked by BM25."""
+        location = normalize_location(location)
+        match_expr = _to_match_expression(query)
+
+        if match_expr:
+            rows = self._conn.execute(
+                "SELECT payload FROM activities WHERE activities MATCH ? AND location = ? "
+                "ORDER BY bm25(activities) LIMIT ?",
+                (match_expr, location, limit),
+            ).fetchall()
+        else:
+            rows = self._conn.execute(
+                "SELECT payload FROM activities WHERE location = ? LIMIT ?",
+                (location, limit),
+            ).fetchall()
+
+        return [ActivityResult.model_validate_json(payload) for (payload,) in rows]
+
+
+def _to_match_expression(query: str) -> str:
+    """Turn free text into an FTS5 OR-query of quoted terms, so user input can't inject FTS syntax."""
+    terms = re.findall(r"\w+", query.casefold())
+    return " OR ".join(f'"{term}"' for term in terms)
+
+
+@lru_cache(maxsize=1)
+def get_activity_index() -> ActivityIndex:
+    """Return the process-wide activity index, building it on first use."""
+    return ActivityIndex()
+
+
+@lru_cache(maxsize=SEARCH_CACHE_SIZE)
+def _cached_search(location: str, query: str, limit: int) -> str:
+    index = get_activity_index()
+    activities = index.search(location, query, limit)
+
+    if not activities and index.has_location(location):
+        # Nothing matched the keywords, so fall back to everything known for the destination
+        activities = index.search(location, "", limit)
+
+    return json.dumps([activity.model_dump() for activity in activities])
+
+
+def search_activities(location: str, query: str = "", limit: int = DEFAULT_RESULT_LIMIT) -> str:
+    """Search the local activity index, memoizing results per normalized (location, query, limit)."""
+    normalized_query = " ".join(re.findall(r"\w+", query.casefold()))
+    return _cached_search(normalize_location(location), normalized_query, limit)
+
+
+def clamp_result_limit(limit: Optional[int]) -> int:
+    """Keep a model-supplied limit within 1..MAX_RESULT_LIMIT, which also bounds the search cache keys."""
+    return min(max(limit or DEFAULT_RESULT_LIMIT, 1), MAX_RESULT_LIMIT)
+
+
+def _search_local_activities(location: str, query: str, limit: Optional[int] = None) -> str:
+    results = search_activities(location, query, clamp_result_limit(limit))
+    if results == "[]":
+        return f"No local activities indexed for {location}. Use web search if it is available."
+    return results
+
+
+# Set before wrapping, so the tool description the model sees always states the real maximum
+_search_local_activities.__doc__ = f"""Search the curated local activity index for a destination.
+
+    :param location: The trip destination city, e.g. "Bogota"
+    :param query: Keywords describing the desired activities, e.g. "indoor museum kids rainy day"
+    :param limit: Maximum number of activities to return, between 1 and {MAX_RESULT_LIMIT}
+    :return: A JSON list of ActivityResult objects, or a message when the destination is not indexed
+    """
+search_local_activities = function_tool(_search_local_activities, name_override="search_local_activities")
+
+
+def get_search_tools(backend: SearchBackend = SearchBackend.LOCAL, hosted_fallback: bool = True) -> List[Tool]:
+    """Return the search tools an activity agent should use for the given backend.
+
+    The local backend exposes the indexed search tool and, when `hosted_fallback` is set,
+    also the hosted WebSearchTool for destinations the corpus does not cover.
+    """
+    if SearchBackend(backend) is SearchBackend.HOSTED:
+        return [WebSearchTool()]
+
+    tools: List[Tool] = [search_local_activities]
+    if hosted_fallback:
+        tools.append(WebSearchTool())
+    return tools
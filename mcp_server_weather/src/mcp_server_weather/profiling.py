@@ -0,0 +1,104 @@
+import asyncio
+import itertools
+import json
+import os
+import sys
+import time
+import weakref
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+# Set by the client to enable profiling; spans are written to
+# <MCP_WEATHER_PROFILE_DIR>/mcp-weather-<MCP_WEATHER_TRACE_ID>-<pid>.json
+PROFILE_DIR_ENV = "MCP_WEATHER_PROFILE_DIR"
+TRACE_ID_ENV = "MCP_WEATHER_TRACE_ID"
+
+
+def _now_us() -> int:
+    # Wall-clock time, so spans line up with the ones recorded by the client process
+    return time.time_ns() // 1000
+
+
+class ToolCallProfiler:
+    """Records tool call spans in the Chrome trace event format, one track per asyncio task."""
+
+    def __init__(self, output_dir: Optional[Path], trace_id: str):
+        self.output_dir = output_dir
+        self.trace_id = trace_id
+        self._pid = os.getpid()
+        self._events: List[Dict[str, Any]] = [
+            {"ph": "M", "name": "process_name", "pid": self._pid, "tid": 0, "args": {"name": "mcp-server-weather"}}
+        ]
+        self._task_tids: "weakref.WeakKeyDictionary[asyncio.Task, int]" = weakref.WeakKeyDictionary()
+        self._next_tid = itertools.count(1)
+
+    @classmethod
+    def from_env(cls) -> "ToolCallProfiler":
+        """Create a profiler from the environment; it records nothing unless a profile directory is set."""
+        output_dir = os.environ.get(PROFILE_DIR_ENV)
+        return cls(Path(output_dir) if output_dir else None, os.environ.get(TRACE_ID_ENV, "no-trace-id"))
+
+    @property
+    def enabled(self) -> bool:
+        return self.output_dir is not None
+
+    def _current_tid(self) -> int:
+        task = asyncio.current_task()
+        if task is None:
+            return 0
+
+        tid = self._task_tids.get(task)
+        if tid is None:
+            tid = next(self._next_tid)
+            self._task_tids[task] = tid
+            self._events.append(
+                {"ph": "M", "name": "thread_name", "pid": self._pid, "tid": tid, "args": {"name": task.get_name()}}
+            )
+        return tid
+
+    @contextmanager
+    def span(self, name: str, **args: Any) -> Iterator[None]:
+        """Record the duration of the enclosed block; does nothing when profiling is disabled."""
+        if not self.enabled:
+            yield
+            return
+
+        tid = self._current_tid()
+        start_us = _now_us()
+        try:
+            yield
+        finally:
+            self._events.append(
+                {
+                    "ph": "X",
+                    "name": name,
+                    "cat": "mcp-server",
+                    "ts": start_us,
+                    "dur": _now_us() - start_us,
+                    "pid": self._pid,
+                    "tid": tid,
+                    "args": {"trace_id": self.trace_id, **args},
+                }
+            )
+
+    def write(self) -> None:
+        """Write the spans recorded so far to the profile directory, if profiling is enabled.
+
+        Called after every tool call, so the spans survive the server being terminated
+        rather than shut down through stdin EOF. The file is replaced atomically, so the
+        client never reads a partially written one. Write errors are only logged, since
+        profiling must never fail a tool call.
+        """
+        if not self.enabled:
+            return
+
+        path = self.output_dir / f"mcp-weather-{self.trace_id}-{self._pid}.json"
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"traceEvents": self._events}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            # stdout carries the MCP protocol, so diagnostics go to stderr
+            print(f"Could not write profile {path}: {e}", file=sys.stderr)
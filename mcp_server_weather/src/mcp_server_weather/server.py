@@ -9,6 +9,8 @@ from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent, ImageContent, EmbeddedResource
 from mcp.shared.exceptions import McpError
 
+from .profiling import ToolCallProfiler
+
 
 class WeatherTools(str, Enum):
     GET_CURRENT_WEATHER = "get_current_weather"
@@ -109,6 +111,7 @@ class WeatherServer:
 async def serve() -> None:
     server = Server("mcp-weather")
     weather_server = WeatherServer()
+    profiler = ToolCallProfiler.from_env()
 
     @server.list_tools()
     async def list_tools() -> list[Tool]:
@@ -157,6 +160,16 @@ async def serve() -> None:
         name: str, arguments: dict
     ) -> Sequence[TextContent | ImageContent | EmbeddedResource]:
         """Handle tool calls for weather queries."""
+        try:
+            with profiler.span("call_tool", tool=name):
+                return await handle_tool_call(name, arguments)
+        finally:
+            profiler.write()
+
+    async def handle_tool_call(
+        name: str, arguments: dict
+    ) -> Sequence[TextContent | ImageContent | EmbeddedResource]:
+        """Dispatch a tool call to the weather server and encode its result."""
         try:
             match name:
                 case WeatherTools.GET_CURRENT_WEATHER.value:
@@ -166,7 +179,8 @@ async def serve() -> None:
                     if latitude is None or longitude is None:
                         raise ValueError("Missing required arguments: latitude and longitude")
 
-                    result = await weather_server.get_current_weather(latitude, longitude)
+                    with profiler.span("get_current_weather"):
+                        result = await weather_server.get_current_weather(latitude, longitude)
 
                 case WeatherTools.GET_FORECAST.value:
                     latitude = arguments.get("latitude")
@@ -175,18 +189,23 @@ async def serve() -> None:
                     if latitude is None or longitude is None:
                         raise ValueError("Missing required arguments: latitude and longitude")
 
-                    result = await weather_server.get_forecast(latitude, longitude)
+                    with profiler.span("get_forecast"):
+                        result = await weather_server.get_forecast(latitude, longitude)
                 
                 case _:
                     raise ValueError(f"Unknown tool: {name}")
 
-            return [
-                TextContent(type="text", text=json.dumps(result.model_dump(), indent=2))
-            ]
+            with profiler.span("json_encode"):
+                text = json.dumps(result.model_dump(), indent=2)
+
+            return [TextContent(type="text", text=text)]
 
         except Exception as e:
             raise ValueError(f"Error processing mcp-server-weather query: {str(e)}")
 
     options = server.create_initialization_options()
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(read_stream, write_stream, options) 
\ No newline at end of file
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await server.run(read_stream, write_stream, options)
+    finally:
+        profiler.write() 
\ No newline at end of file